@@ -4,7 +4,15 @@ from functools import lru_cache
 from pathlib import Path
 
 import pandas as pd
-import requests  # 필요 없으면 나중에 지워도 됨
+
+from services.session import make_session
+
+try:
+    import streamlit as st
+    # Streamlit 에서는 rerun / 세션이 바뀌어도 파싱 결과를 재사용
+    _table_cache = st.cache_data(show_spinner=False)
+except ImportError:
+    _table_cache = lru_cache(maxsize=1)
 
 LOCAL_COMPANY_FILE = (
     Path(__file__).resolve().parent.parent / "data" / "t187ap03_L.json"
@@ -12,9 +20,18 @@ LOCAL_COMPANY_FILE = (
     # Path(__file__).resolve().parent.parent / "data" / "t187ap03_L.csv"
 )
 
+# 정리된 code/name 만 parquet 으로 저장해 두고 다음부터는 이것을 읽음 (JSON 파싱보다 빠름)
+LOCAL_COMPANY_PARQUET = LOCAL_COMPANY_FILE.with_suffix(".parquet")
+
 TWSE_COMPANY_BASIC = "https://openapi.twse.com.tw/v1/opendata/t187ap03_L"
 ISIN_URL = "https://isin.twse.com.tw/isin/C_public.jsp?strMode=2"
 
+# "2330　台積電" → ("2330", "台積電")
+_ISIN_PAT = re.compile(r"^(\d{4})\s+(.+)$")
+
+# openapi 요청용 세션 (연결 재사용)
+_SESSION = make_session()
+
 
 def _normalize_company_df(df: pd.DataFrame) -> pd.DataFrame:
     """열 이름 정리 + code/name 추출 + 4자리 코드만 남기기"""
@@ -49,10 +66,38 @@ def _normalize_company_df(df: pd.DataFrame) -> pd.DataFrame:
         }
     )
 
-    # 4자리 숫자 코드만
-    out = out[out["code"].str.fullmatch(r"\d{4}")]
+    # 4자리 숫자 코드만 (정규식 대신 길이 + isdigit 체크)
+    out = out[out["code"].str.len().eq(4) & out["code"].str.isdigit()]
     out = out.drop_duplicates(subset=["code"], keep="first").reset_index(drop=True)
-    return out
+    return _to_arrow_strings(out)
+
+
+def _to_arrow_strings(df: pd.DataFrame) -> pd.DataFrame:
+    """code/name 을 string[pyarrow] 로 (검색 시 .str.contains 가 Arrow C++ 커널로 돎)"""
+    try:
+        return df.astype({"code": "string[pyarrow]", "name": "string[pyarrow]"})
+    except ImportError:
+        # pyarrow 없으면 object dtype 그대로
+        return df
+
+
+def _read_csv(src) -> pd.DataFrame:
+    """pyarrow → C 엔진 순으로 읽고, 파싱 에러일 때만 느린 python 엔진으로 재시도"""
+    def rewind():
+        if hasattr(src, "seek"):
+            src.seek(0)
+
+    try:
+        return pd.read_csv(src, engine="pyarrow", on_bad_lines="skip")
+    except (ImportError, ValueError, pd.errors.ParserError):
+        # pyarrow 미설치 / 지원 안 되는 옵션 / 파싱 실패
+        rewind()
+
+    try:
+        return pd.read_csv(src, on_bad_lines="skip")
+    except pd.errors.ParserError:
+        rewind()
+        return pd.read_csv(src, engine="python", on_bad_lines="skip")
 
 
 # 🔹 1) "로컬에 저장해 둔 t187ap03_L 파일"에서 읽어오기
@@ -60,6 +105,26 @@ def _load_company_from_local() -> pd.DataFrame:
     if not LOCAL_COMPANY_FILE.exists():
         raise FileNotFoundError(f"회사 기본자료 파일을 찾을 수 없습니다: {LOCAL_COMPANY_FILE}")
 
+    # 원본보다 새 parquet 이 있으면 그걸 바로 사용
+    if (
+        LOCAL_COMPANY_PARQUET.exists()
+        and LOCAL_COMPANY_PARQUET.stat().st_mtime >= LOCAL_COMPANY_FILE.stat().st_mtime
+    ):
+        try:
+            return _to_arrow_strings(pd.read_parquet(LOCAL_COMPANY_PARQUET))
+        except Exception as e:
+            print("Company parquet load failed:", e)
+
+    df = _read_company_source()
+    try:
+        df.to_parquet(LOCAL_COMPANY_PARQUET, compression="zstd", index=False)
+    except Exception as e:
+        # pyarrow 가 없거나 쓰기 권한이 없으면 그냥 원본만 사용
+        print("Company parquet save failed:", e)
+    return df
+
+
+def _read_company_source() -> pd.DataFrame:
     suffix = LOCAL_COMPANY_FILE.suffix.lower()
 
     if suffix == ".json":
@@ -69,7 +134,7 @@ def _load_company_from_local() -> pd.DataFrame:
 
     elif suffix == ".csv":
         # CSV로 저장한 경우
-        df = pd.read_csv(LOCAL_COMPANY_FILE, engine="python", on_bad_lines="skip")
+        df = _read_csv(LOCAL_COMPANY_FILE)
         return _normalize_company_df(df)
 
     else:
@@ -78,13 +143,13 @@ def _load_company_from_local() -> pd.DataFrame:
             df = pd.read_json(LOCAL_COMPANY_FILE)
             return _normalize_company_df(df)
         except Exception:
-            df = pd.read_csv(LOCAL_COMPANY_FILE, engine="python", on_bad_lines="skip")
+            df = _read_csv(LOCAL_COMPANY_FILE)
             return _normalize_company_df(df)
 
 
 # 🔹 2) (선택) 여전히 온라인에서 받아오는 버전 – 로컬 실패 시 백업용
 def _fetch_company_from_openapi() -> pd.DataFrame:
-    r = requests.get(TWSE_COMPANY_BASIC, timeout=20)
+    r = _SESSION.get(TWSE_COMPANY_BASIC, timeout=20)
     r.raise_for_status()
     txt = r.text.strip()
 
@@ -97,7 +162,7 @@ def _fetch_company_from_openapi() -> pd.DataFrame:
         pass
 
     # CSV 관대 파싱
-    df = pd.read_csv(io.StringIO(txt), engine="python", on_bad_lines="skip")
+    df = _read_csv(io.StringIO(txt))
     return _normalize_company_df(df)
 
 
@@ -115,18 +180,18 @@ def _fetch_company_from_isin_backup() -> pd.DataFrame:
 
     def split_code_name(x):
         s = str(x)
-        m = re.match(r"^(\d{4})\s+(.+)$", s)
+        m = _ISIN_PAT.match(s)
         if m:
             return m.group(1), m.group(2)
         return "", s
 
     t["code"], t["name"] = zip(*t["有價證券代號及名稱"].map(split_code_name))
     out = t[["code", "name"]]
-    out = out[out["code"].str.fullmatch(r"\d{4}")]
+    out = out[out["code"].str.len().eq(4) & out["code"].str.isdigit()]
     return out.drop_duplicates(subset=["code"]).reset_index(drop=True)
 
 
-@lru_cache(maxsize=1)
+@_table_cache
 def load_company_table() -> pd.DataFrame:
     """
     1순위: 로컬 파일(data/t187ap03_L.*)
@@ -160,12 +225,19 @@ def load_company_table() -> pd.DataFrame:
     return pd.DataFrame(columns=["code", "name"])
 
 
+@_table_cache
+def _load_search_table():
+    """(회사 테이블, 소문자 이름 열) – 같은 테이블에서 같이 만들어서 함께 캐시 (lower() 는 로드할 때 한 번만)"""
+    t = _to_arrow_strings(load_company_table())
+    return t, t["name"].str.lower()
+
+
 def search_code(keyword: str) -> pd.DataFrame:
-    t = load_company_table()
+    t, names_lower = _load_search_table()
     k = (keyword or "").strip().lower().replace("\u3000", " ")
     if t.empty:
         # 회사 테이블 자체가 비어 있으면 바로 빈 결과
         return t.copy()
 
-    m = t["name"].str.lower().str.contains(k, na=False) | t["code"].str.contains(k, na=False)
-    return t[m].copy()
+    m = names_lower.str.contains(k, regex=False) | t["code"].str.contains(k, regex=False)
+    return t[m.fillna(False).to_numpy(dtype=bool)].copy()
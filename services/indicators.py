@@ -0,0 +1,146 @@
+# services/indicators.py
+# Streamlit 은 위젯을 건드릴 때마다 앱 스크립트를 다시 실행하므로,
+# numba 커널은 import 되는 모듈에 둬야 JIT 결과가 rerun 사이에 유지됨
+import numpy as np
+import pandas as pd
+
+try:
+    from numba import njit
+    _HAS_NUMBA = True
+except ImportError:  # numba 없으면 pandas rolling/ewm 으로 계산
+    _HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        return lambda f: f
+
+# ============ 技術指標 計算函數 ============
+@njit(cache=True)
+def _rolling_mean(x, window):
+    """結果與 rolling(window).mean() 相同 (前 window-1 筆為 NaN)"""
+    n = len(x)
+    y = np.full(n, np.nan)
+    # 每個視窗重新加總，避免累加/扣除造成的誤差殘留
+    for i in range(window - 1, n):
+        acc = 0.0
+        for j in range(i - window + 1, i + 1):
+            acc += x[j]
+        y[i] = acc / window
+    return y
+
+
+@njit(cache=True)
+def _ewm_span(x, span):
+    """結果與 ewm(span=span, adjust=False).mean() 相同"""
+    alpha = 2.0 / (span + 1.0)
+    y = np.empty_like(x)
+    if len(x) == 0:
+        return y
+    y[0] = x[0]
+    for i in range(1, len(x)):
+        y[i] = alpha * x[i] + (1.0 - alpha) * y[i - 1]
+    return y
+
+
+@njit(cache=True, error_model="numpy")
+def _rsi(close, period):
+    """結果與 rolling 平均版 RSI 相同 (漲跌拆分與平均在同一個函數內完成)"""
+    n = len(close)
+    gains = np.zeros(n)
+    losses = np.zeros(n)
+    for i in range(1, n):
+        d = close[i] - close[i - 1]
+        if d > 0:
+            gains[i] = d
+        elif d < 0:
+            losses[i] = -d
+    avg_gain = _rolling_mean(gains, period)
+    avg_loss = _rolling_mean(losses, period)
+    return 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+
+def compute_indicators(df, ma_periods=(5, 20, 60), rsi_period=14,
+                       macd_fast=12, macd_slow=26, macd_signal=9,
+                       bb_period=20, bb_std=2, vol_periods=(5, 20)):
+    """技術指標一次計算 (MA / RSI / MACD / 布林通道 / 成交量均線)
+
+    收盤價、成交股數只取一次，所有指標共用，回傳 {欄位名: ndarray}
+    """
+    close_arr = df['收盤價'].to_numpy(dtype=np.float64)
+    vol_arr = df['成交股數'].to_numpy(dtype=np.float64)
+
+    # numba 版只處理沒有缺值的情況 (NaN 的處理規則和 pandas 不同)
+    if _HAS_NUMBA and not (np.isnan(close_arr).any() or np.isnan(vol_arr).any()):
+        return _compute_indicators_numba(
+            close_arr, vol_arr, ma_periods, rsi_period,
+            macd_fast, macd_slow, macd_signal, bb_period, bb_std, vol_periods,
+        )
+
+    close = pd.Series(close_arr, index=df.index)
+    vol = pd.Series(vol_arr, index=df.index)
+    out = {}
+
+    # 移動平均線 (MA)
+    for period in ma_periods:
+        out[f'MA{period}'] = close.rolling(window=period).mean()
+
+    # 相對強弱指標 (RSI)
+    delta = close.diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=rsi_period).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=rsi_period).mean()
+    rs = gain / loss
+    out['RSI'] = 100 - (100 / (1 + rs))
+
+    # MACD指標
+    exp1 = close.ewm(span=macd_fast, adjust=False).mean()
+    exp2 = close.ewm(span=macd_slow, adjust=False).mean()
+    macd = exp1 - exp2
+    signal = macd.ewm(span=macd_signal, adjust=False).mean()
+    out['MACD'] = macd
+    out['MACD_Signal'] = signal
+    out['MACD_Hist'] = macd - signal
+
+    # 布林通道 (Bollinger Bands) – 中軌與 MA20 相同就直接共用
+    middle = out.get(f'MA{bb_period}')
+    if middle is None:
+        middle = close.rolling(window=bb_period).mean()
+    rolling_std = close.rolling(window=bb_period).std()
+    out['BB_Middle'] = middle
+    out['BB_Upper'] = middle + (rolling_std * bb_std)
+    out['BB_Lower'] = middle - (rolling_std * bb_std)
+
+    # 成交量移動平均
+    for period in vol_periods:
+        out[f'VOL_MA{period}'] = vol.rolling(window=period).mean()
+
+    return {k: v.to_numpy() for k, v in out.items()}
+
+
+def _compute_indicators_numba(close, vol, ma_periods, rsi_period,
+                              macd_fast, macd_slow, macd_signal,
+                              bb_period, bb_std, vol_periods):
+    """compute_indicators 的 numba 版本 (直接在 ndarray 上計算)"""
+    out = {}
+    for period in ma_periods:
+        out[f'MA{period}'] = _rolling_mean(close, period)
+
+    out['RSI'] = _rsi(close, rsi_period)
+
+    macd = _ewm_span(close, macd_fast) - _ewm_span(close, macd_slow)
+    signal = _ewm_span(macd, macd_signal)
+    out['MACD'] = macd
+    out['MACD_Signal'] = signal
+    out['MACD_Hist'] = macd - signal
+
+    middle = out.get(f'MA{bb_period}')
+    if middle is None:
+        middle = _rolling_mean(close, bb_period)
+    # 標準差 (ddof=1) 仍交給 pandas，數值比較穩定
+    rolling_std = pd.Series(close).rolling(window=bb_period).std().to_numpy()
+    out['BB_Middle'] = middle
+    out['BB_Upper'] = middle + (rolling_std * bb_std)
+    out['BB_Lower'] = middle - (rolling_std * bb_std)
+
+    for period in vol_periods:
+        out[f'VOL_MA{period}'] = _rolling_mean(vol, period)
+
+    return out
@@ -1,17 +1,43 @@
 # services/market.py
-import json
+import time
+from concurrent.futures import ThreadPoolExecutor
 from functools import lru_cache
 from datetime import datetime, date
-from dateutil.relativedelta import relativedelta
+from pathlib import Path
 import pandas as pd
 import requests
 import urllib3
 
+from services.session import make_session
+
+try:
+    from diskcache import Cache
+except ImportError:  # diskcache 없으면 메모리 캐시만 사용
+    Cache = None
+
 TWSE_STOCK_DAY_URL = "https://www.twse.com.tw/exchangeReport/STOCK_DAY"
 
+# 지난 달 데이터는 바뀌지 않으니 디스크에 저장해 두고 프로세스가 바뀌어도 재사용
+DISK_CACHE_DIR = Path(__file__).resolve().parent.parent / ".cache" / "twse"
+CURRENT_MONTH_TTL = 60 * 60  # 이번 달(아직 진행 중) 데이터는 메모리에 1시간만 보관
+
+_DISK = None
+if Cache is not None:
+    try:
+        _DISK = Cache(str(DISK_CACHE_DIR))
+    except Exception as e:
+        print("Disk cache init failed:", e)
+
 # SSL 검증 끄면 경고가 뜨니까, 보기 싫으면 이 줄로 경고만 꺼줄 수 있음
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
+# 월마다 새 연결(TCP+TLS)을 맺지 않도록 세션 하나를 재사용 (keep-alive)
+_SESSION = make_session()
+
+
+# 숫자로 바꿔야 하는 STOCK_DAY 열
+NUM_COLS = ["成交股數","成交金額","開盤價","最高價","最低價","收盤價","漲跌價差","成交筆數"]
+
 
 def to_num(s):
     import math
@@ -23,60 +49,118 @@ def to_num(s):
 
 
 def month_list(start_d: date, end_d: date):
-    cur = date(start_d.year, start_d.month, 1)
-    last = date(end_d.year, end_d.month, 1)
-    out = []
-    while cur <= last:
-        out.append(cur.strftime("%Y%m01"))
-        cur += relativedelta(months=1)
-    return out
+    # (year*12 + month-1) 정수로 달을 세면 relativedelta 없이 바로 만들 수 있음
+    a = start_d.year * 12 + start_d.month - 1
+    b = end_d.year * 12 + end_d.month - 1
+    return [f"{i // 12:04d}{i % 12 + 1:02d}01" for i in range(a, b + 1)]
 
 
-@lru_cache(maxsize=4096)
-def fetch_month(stock_no: str, yyyymm01: str) -> str:
+def _download_month(stock_no: str, yyyymm01: str):
+    """TWSE STOCK_DAY 한 달치 JSON (dict). 에러면 None"""
     params = {"response": "json", "date": yyyymm01, "stockNo": stock_no}
     try:
         # 🔥 핵심: verify=False 로 SSL 인증서 검증을 끄고 요청
-        r = requests.get(TWSE_STOCK_DAY_URL, params=params, timeout=15, verify=False)
+        r = _SESSION.get(TWSE_STOCK_DAY_URL, params=params, timeout=15, verify=False)
         r.raise_for_status()
-        js = r.json()
-        return json.dumps(js, ensure_ascii=False)
+        return r.json()
     except requests.exceptions.SSLError as e:
         # Streamlit Cloud 등에서 SSL 깨질 때
         print("SSL error when calling TWSE:", e)
     except Exception as e:
         print("Error when calling TWSE:", e)
+    return None
+
 
-    # 에러일 때는 빈 구조를 돌려줘서 아래에서 빈 DataFrame이 나오도록
-    return json.dumps({"data": [], "fields": []}, ensure_ascii=False)
+def parse_roc_date_str(s: str) -> datetime:
+    # 민국 날짜 "114/01/02" → datetime(2025, 1, 2)
+    y, m, d = s.strip().split("/")
+    return datetime(int(y) + 1911, int(m), int(d))
 
 
-def month_json_to_df(js_str: str) -> pd.DataFrame:
-    js = json.loads(js_str)
+def _month_js_to_df(js: dict) -> pd.DataFrame:
     data, fields = js.get("data", []), js.get("fields", [])
     if not data or not fields:
         return pd.DataFrame()
-    df = pd.DataFrame(data, columns=fields)
+    return pd.DataFrame(data, columns=fields)
 
-    def parse_roc_date_str(s):
-        y, m, d = s.strip().split("/")
-        return datetime(int(y) + 1911, int(m), int(d))
 
-    df["日期_dt"] = df["日期"].apply(parse_roc_date_str)
-    for col in ["成交股數","成交金額","開盤價","最高價","最低價","收盤價","漲跌價差","成交筆數"]:
-        df[col] = df[col].apply(to_num)
+class _NotCacheable(Exception):
+    """네트워크 에러 – lru_cache 에 남지 않도록 예외로 빠져나옴"""
+
+
+# 상장 전 달 등 "데이터 없음" 이 확정된 응답의 stat 메시지
+TWSE_NO_DATA_STAT = "沒有符合條件的資料"
+
+
+def _is_past_month(yyyymm01: str) -> bool:
+    return yyyymm01[:6] < date.today().strftime("%Y%m")
+
+
+@lru_cache(maxsize=4096)
+def _fetch_month_df_cached(stock_no: str, yyyymm01: str, ttl_bucket: int) -> pd.DataFrame:
+    # 캐시에는 JSON 대신 DataFrame 을 저장 (hit 때 json 파싱 / DataFrame 생성 없음, 값 변환은 fetch_range 에서)
+    # ttl_bucket: 지난 달은 0, 이번 달은 1시간마다 바뀌는 값 → 메모리 캐시에도 TTL 적용
+    key = f"{stock_no}:{yyyymm01}"
+    # 디스크는 지난 달만 사용 (이번 달은 메모리 캐시의 ttl_bucket 으로만 관리해서 오래된 값이 안 섞이게)
+    use_disk = _DISK is not None and _is_past_month(yyyymm01)
+    if use_disk:
+        try:
+            cached = _DISK.get(key)
+            if isinstance(cached, pd.DataFrame):
+                return cached
+        except Exception as e:
+            print("Disk cache read failed:", e)
+
+    js = _download_month(stock_no, yyyymm01)
+    if js is None:
+        # 네트워크 에러는 저장하지 않고 다음에 다시 요청
+        raise _NotCacheable(key)
+
+    # stat != OK 이거나 data 가 없으면 빈 DataFrame (메모리에는 그대로 캐시)
+    df = _month_js_to_df(js) if js.get("stat") == "OK" else pd.DataFrame()
+
+    # 디스크에는 정상 응답 / "데이터 없음" 확정 응답만 만료 없이 저장
+    # (요청 과다·점검 중 메시지가 재시작 후에도 남지 않도록)
+    stat = str(js.get("stat", ""))
+    if use_disk and (stat == "OK" or TWSE_NO_DATA_STAT in stat):
+        try:
+            _DISK.set(key, df, expire=None)
+        except Exception as e:
+            print("Disk cache write failed:", e)
     return df
 
 
+def _fetch_month_df(stock_no: str, yyyymm01: str) -> pd.DataFrame:
+    ttl_bucket = 0 if _is_past_month(yyyymm01) else int(time.time() // CURRENT_MONTH_TTL)
+    try:
+        return _fetch_month_df_cached(stock_no, yyyymm01, ttl_bucket)
+    except _NotCacheable:
+        return pd.DataFrame()
+
+
+def fetch_month_df(stock_no: str, yyyymm01: str) -> pd.DataFrame:
+    """한 달치 시세 DataFrame (캐시 객체를 건드리지 않도록 복사본 반환)"""
+    return _fetch_month_df(stock_no, yyyymm01).copy()
+
+
 def fetch_range(stock_no: str, start_d: date, end_d: date) -> pd.DataFrame:
-    parts = []
-    for m in month_list(start_d, end_d):
-        js = fetch_month(stock_no, m)
-        dfm = month_json_to_df(js)
-        if not dfm.empty:
-            parts.append(dfm)
+    # 미래 달은 데이터가 있을 수 없으니 요청 자체를 하지 않음
+    end_d = min(end_d, date.today())
+    months = month_list(start_d, end_d)
+    if not months:
+        return pd.DataFrame()
+
+    # 월별 요청은 네트워크 대기 시간이 대부분이라 스레드로 동시에 보냄
+    with ThreadPoolExecutor(max_workers=min(8, len(months))) as ex:
+        dfs = list(ex.map(lambda m: fetch_month_df(stock_no, m), months))
+
+    parts = [dfm for dfm in dfs if not dfm.empty]
     if not parts:
         return pd.DataFrame()
     df = pd.concat(parts, ignore_index=True)
+    # 날짜 / 숫자 변환은 달마다 하지 않고 합친 뒤 한 번만 (행 수가 적어서 벡터 연산보다 빠름)
+    df["日期_dt"] = df["日期"].apply(parse_roc_date_str)
+    for col in NUM_COLS:
+        df[col] = df[col].apply(to_num)
     df = df[(df["日期_dt"].dt.date >= start_d) & (df["日期_dt"].dt.date <= end_d)]
     return df.sort_values("日期_dt").reset_index(drop=True)
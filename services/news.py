@@ -1,22 +1,36 @@
 # services/news.py
 from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, date
 from typing import Dict, List
+import heapq
+import html
+import re
 import time
 import urllib.parse
 
 import feedparser
-from bs4 import BeautifulSoup
+
+try:
+    import streamlit as st
+    # 같은 검색 조건이면 1시간 동안은 RSS 를 다시 받지 않음
+    _news_cache = st.cache_data(ttl=3600, show_spinner=False)
+except ImportError:
+    def _news_cache(f):
+        return f
+
+_TAG = re.compile(r"<[^>]+>")
+_WS = re.compile(r"\s+")
 
 def _month_key(d: date) -> str:
     return f"{d.year:04d}-{d.month:02d}"
 
-def _clean_summary(html: str) -> str:
-    # RSS summary에서 태그 제거 + 공백 정리
-    soup = BeautifulSoup(html or "", "html.parser")
-    txt = " ".join(soup.get_text(" ").split())
-    return txt
+def _clean_summary(html_s: str) -> str:
+    # RSS summary에서 태그 제거 + 공백 정리 (파싱 트리 안 만들고 정규식으로)
+    txt = html.unescape(_TAG.sub(" ", html_s or ""))
+    return _WS.sub(" ", txt).strip()
 
+@_news_cache
 def fetch_monthly_top_news(
     keyword: str,
     start_d: date,
@@ -70,7 +84,30 @@ def fetch_monthly_top_news(
     month_keys = sorted(by_month.keys())
     out = OrderedDict()
     for mk in month_keys:
-        # 최신순 정렬
-        out[mk] = sorted(by_month[mk], key=lambda x: x["published"], reverse=True)[:per_month]
+        # 최신순 상위 N개 (전체 정렬 없이 부분 선택, sorted(...)[:N] 와 같은 결과)
+        out[mk] = heapq.nlargest(per_month, by_month[mk], key=lambda x: x["published"])
 
     return out
+
+
+def fetch_monthly_top_news_many(
+    keywords: List[str],
+    start_d: date,
+    end_d: date,
+    per_month: int = 5,
+    lang_region: str = "zh-TW",
+    geo: str = "TW"
+) -> "Dict[str, OrderedDict[str, List[dict]]]":
+    """
+    여러 keyword 를 동시에 조회 (RSS 요청은 네트워크 대기라 스레드로 병렬 처리)
+    keyword → fetch_monthly_top_news 결과
+    """
+    keywords = list(keywords)
+    if not keywords:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(8, len(keywords))) as ex:
+        results = list(ex.map(
+            lambda k: fetch_monthly_top_news(k, start_d, end_d, per_month, lang_region, geo),
+            keywords,
+        ))
+    return dict(zip(keywords, results))
@@ -0,0 +1,18 @@
+# services/session.py
+import requests
+from requests.adapters import HTTPAdapter
+import urllib3
+
+
+def make_session() -> requests.Session:
+    """연결(TCP+TLS)을 재사용하는 세션 (keep-alive) – 풀 크기 / 재시도 설정은 여기서만 관리"""
+    s = requests.Session()
+    s.mount(
+        "https://",
+        HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=16,
+            max_retries=urllib3.Retry(total=2, backoff_factor=0.2),
+        ),
+    )
+    return s
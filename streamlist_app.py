@@ -8,50 +8,12 @@ import numpy as np
 from utils.dates import ad_to_roc, parse_roc_date
 from services.company import search_code
 from services.market import fetch_range
+from services.indicators import compute_indicators
 from services.news import fetch_monthly_top_news
 
 import plotly.express as px
 import plotly.graph_objects as go
 
-# ============ 技術指標 計算函數 ============
-def calculate_ma(df, periods=[5, 20, 60]):
-    """移動平均線 (MA)"""
-    for period in periods:
-        df[f'MA{period}'] = df['收盤價'].rolling(window=period).mean()
-    return df
-
-def calculate_rsi(df, period=14):
-    """相對強弱指標 (RSI)"""
-    delta = df['收盤價'].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-    rs = gain / loss
-    df['RSI'] = 100 - (100 / (1 + rs))
-    return df
-
-def calculate_macd(df, fast=12, slow=26, signal=9):
-    """MACD指標"""
-    exp1 = df['收盤價'].ewm(span=fast, adjust=False).mean()
-    exp2 = df['收盤價'].ewm(span=slow, adjust=False).mean()
-    df['MACD'] = exp1 - exp2
-    df['MACD_Signal'] = df['MACD'].ewm(span=signal, adjust=False).mean()
-    df['MACD_Hist'] = df['MACD'] - df['MACD_Signal']
-    return df
-
-def calculate_bollinger_bands(df, period=20, std=2):
-    """布林通道 (Bollinger Bands)"""
-    df['BB_Middle'] = df['收盤價'].rolling(window=period).mean()
-    rolling_std = df['收盤價'].rolling(window=period).std()
-    df['BB_Upper'] = df['BB_Middle'] + (rolling_std * std)
-    df['BB_Lower'] = df['BB_Middle'] - (rolling_std * std)
-    return df
-
-def calculate_volume_ma(df, periods=[5, 20]):
-    """成交量移動平均"""
-    for period in periods:
-        df[f'VOL_MA{period}'] = df['成交股數'].rolling(window=period).mean()
-    return df
-
 # ============ Streamlit 기본 설정 ============
 st.set_page_config(page_title="台股行情 + 新聞", layout="wide")
 
@@ -137,11 +99,15 @@ if st.session_state.get("go"):
         st.stop()
 
     # ========== 技術指標 計算 ==========
-    df = calculate_ma(df)
-    df = calculate_rsi(df)
-    df = calculate_macd(df)
-    df = calculate_bollinger_bands(df)
-    df = calculate_volume_ma(df)
+    cols = compute_indicators(df)
+    df = df.assign(**cols)
+
+    # 圖表直接吃 ndarray (比傳 Series 給 Plotly 快)；折線用 WebGL (Scattergl) + float32
+    dates = df["日期_dt"].to_numpy()
+    close = df["收盤價"].to_numpy()
+    close32 = close.astype(np.float32)
+    # 成交量均線 (1e7~1e8) 超過 float32 的有效位數，維持 float64 只轉價格/指標
+    cols32 = {k: v if k.startswith("VOL_") else v.astype(np.float32) for k, v in cols.items()}
 
     end_shown = df["日期_dt"].dt.date.max()
 
@@ -159,15 +125,15 @@ if st.session_state.get("go"):
     st.info("**說明**: 移動平均線可以幫助識別趨勢方向。MA5(短期)、MA20(中期)、MA60(長期)。當短期均線向上穿越長期均線時為「黃金交叉」(買入信號)，反之為「死亡交叉」(賣出信號)。")
     
     fig_ma = go.Figure()
-    fig_ma.add_trace(go.Scatter(x=df["日期_dt"], y=df["收盤價"], 
+    fig_ma.add_trace(go.Scattergl(x=dates, y=close32, 
                                 name="收盤價", line=dict(color='blue', width=2)))
     
     if show_ma:
-        fig_ma.add_trace(go.Scatter(x=df["日期_dt"], y=df["MA5"], 
+        fig_ma.add_trace(go.Scattergl(x=dates, y=cols32["MA5"], 
                                     name="MA5", line=dict(color='orange', width=1)))
-        fig_ma.add_trace(go.Scatter(x=df["日期_dt"], y=df["MA20"], 
+        fig_ma.add_trace(go.Scattergl(x=dates, y=cols32["MA20"], 
                                     name="MA20", line=dict(color='red', width=1)))
-        fig_ma.add_trace(go.Scatter(x=df["日期_dt"], y=df["MA60"], 
+        fig_ma.add_trace(go.Scattergl(x=dates, y=cols32["MA60"], 
                                     name="MA60", line=dict(color='green', width=1)))
     
     fig_ma.update_layout(title="收盤價與移動平均線", xaxis_title="日期", yaxis_title="價格")
@@ -179,13 +145,13 @@ if st.session_state.get("go"):
         st.info("**說明**: 布林通道由中軌(20日均線)和上下軌(±2個標準差)組成。價格接近上軌表示超買，接近下軌表示超賣。通道收窄時表示波動率低，可能預示大行情來臨。")
         
         fig_bb = go.Figure()
-        fig_bb.add_trace(go.Scatter(x=df["日期_dt"], y=df["BB_Upper"], 
+        fig_bb.add_trace(go.Scattergl(x=dates, y=cols32["BB_Upper"], 
                                     name="上軌", line=dict(color='red', dash='dash')))
-        fig_bb.add_trace(go.Scatter(x=df["日期_dt"], y=df["BB_Middle"], 
+        fig_bb.add_trace(go.Scattergl(x=dates, y=cols32["BB_Middle"], 
                                     name="中軌", line=dict(color='orange')))
-        fig_bb.add_trace(go.Scatter(x=df["日期_dt"], y=df["BB_Lower"], 
+        fig_bb.add_trace(go.Scattergl(x=dates, y=cols32["BB_Lower"], 
                                     name="下軌", line=dict(color='green', dash='dash')))
-        fig_bb.add_trace(go.Scatter(x=df["日期_dt"], y=df["收盤價"], 
+        fig_bb.add_trace(go.Scattergl(x=dates, y=close32, 
                                     name="收盤價", line=dict(color='blue', width=2)))
         
         fig_bb.update_layout(title="布林通道", xaxis_title="日期", yaxis_title="價格")
@@ -197,9 +163,9 @@ if st.session_state.get("go"):
     
     fig_candle = go.Figure(
         data=[go.Candlestick(
-            x=df["日期_dt"],
-            open=df["開盤價"], high=df["最高價"],
-            low=df["最低價"], close=df["收盤價"]
+            x=dates,
+            open=df["開盤價"].to_numpy(), high=df["最高價"].to_numpy(),
+            low=df["最低價"].to_numpy(), close=close
         )]
     )
     fig_candle.update_layout(title="K線圖", xaxis_title="日期", yaxis_title="價格")
@@ -211,7 +177,7 @@ if st.session_state.get("go"):
         st.info("**說明**: RSI範圍為0-100。一般認為RSI > 70為超買區(可能回調)，RSI < 30為超賣區(可能反彈)。RSI在50附近表示多空均衡。")
         
         fig_rsi = go.Figure()
-        fig_rsi.add_trace(go.Scatter(x=df["日期_dt"], y=df["RSI"], 
+        fig_rsi.add_trace(go.Scattergl(x=dates, y=cols32["RSI"], 
                                      name="RSI", line=dict(color='purple', width=2)))
         fig_rsi.add_hline(y=70, line_dash="dash", line_color="red", 
                           annotation_text="超買區 (70)")
@@ -229,11 +195,11 @@ if st.session_state.get("go"):
         st.info("**說明**: MACD由快線(MACD)、慢線(Signal)和柱狀圖(Histogram)組成。當MACD線向上穿越信號線時為買入信號，向下穿越為賣出信號。柱狀圖正值擴大表示上漲動能增強。")
         
         fig_macd = go.Figure()
-        fig_macd.add_trace(go.Scatter(x=df["日期_dt"], y=df["MACD"], 
+        fig_macd.add_trace(go.Scattergl(x=dates, y=cols32["MACD"], 
                                       name="MACD", line=dict(color='blue')))
-        fig_macd.add_trace(go.Scatter(x=df["日期_dt"], y=df["MACD_Signal"], 
+        fig_macd.add_trace(go.Scattergl(x=dates, y=cols32["MACD_Signal"], 
                                       name="Signal", line=dict(color='red')))
-        fig_macd.add_trace(go.Bar(x=df["日期_dt"], y=df["MACD_Hist"], 
+        fig_macd.add_trace(go.Bar(x=dates, y=cols["MACD_Hist"], 
                                   name="Histogram", marker_color='gray'))
         
         fig_macd.update_layout(title="MACD 指標", xaxis_title="日期", yaxis_title="MACD")
@@ -244,11 +210,11 @@ if st.session_state.get("go"):
     st.info("**說明**: 成交量反映市場活躍度。價格上漲伴隨成交量放大表示上漲動能強勁；價格下跌伴隨成交量萎縮可能預示跌勢將盡。成交量均線可以幫助識別異常交易活動。")
     
     fig_vol = go.Figure()
-    fig_vol.add_trace(go.Bar(x=df["日期_dt"], y=df["成交股數"], 
+    fig_vol.add_trace(go.Bar(x=dates, y=df["成交股數"].to_numpy(), 
                              name="成交股數", marker_color='lightblue'))
-    fig_vol.add_trace(go.Scatter(x=df["日期_dt"], y=df["VOL_MA5"], 
+    fig_vol.add_trace(go.Scattergl(x=dates, y=cols32["VOL_MA5"], 
                                  name="5日均量", line=dict(color='orange')))
-    fig_vol.add_trace(go.Scatter(x=df["日期_dt"], y=df["VOL_MA20"], 
+    fig_vol.add_trace(go.Scattergl(x=dates, y=cols32["VOL_MA20"], 
                                  name="20日均量", line=dict(color='red')))
     
     fig_vol.update_layout(title="成交股數與均量", xaxis_title="日期", yaxis_title="成交股數")
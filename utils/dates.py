@@ -1,9 +1,12 @@
 # utils/dates.py
 from datetime import date
+from functools import lru_cache
 
 def roc_to_ad_year(roc_year: int) -> int:
     return int(roc_year) + 1911
 
+# UI 에서 쓰는 (년, 월, 일) 조합은 몇 개 안 되니 rerun 마다 date 를 새로 만들지 않게 캐시
+@lru_cache(maxsize=4096)
 def parse_roc_date(roc_year: int, month: int, day: int = 1) -> date:
     return date(roc_to_ad_year(roc_year), int(month), int(day))
 